@@ -0,0 +1,117 @@
+"""Shared command-line entry points for the fetch job.
+
+`run_fetch.py` and `scripts/batch_process.py` are thin wrappers around
+the two mains in this module, so argument parsing and job plumbing live
+in one place (and are imported once) instead of being duplicated per
+script.
+"""
+import argparse
+import json
+import logging
+import sys
+
+from . import db
+from .config import (
+    DATABASE_DSN,
+    POSTGRES_HOST,
+    POSTGRES_PORT,
+    POSTGRES_DB,
+    POSTGRES_USER,
+    POSTGRES_PASSWORD,
+    build_dsn,
+    setup_logging,
+)
+from .fetch_exchange import fetch_and_store_exchange_rates
+
+logger = logging.getLogger(__name__)
+
+
+def run_fetch_main():
+    """Fetch once using the configured DSN and print a human-readable banner."""
+    setup_logging()
+    try:
+        logger.info("Connecting to database at %s:%s/%s…", POSTGRES_HOST, POSTGRES_PORT, POSTGRES_DB)
+        db.init_pool(DATABASE_DSN)
+
+        logger.info("Fetching exchange rates from DolarAPI…")
+        result = fetch_and_store_exchange_rates()
+
+        # Render the whole banner first and write it once, instead of a
+        # dozen print() calls each taking the stdio lock and flushing a line.
+        rule = "=" * 50
+        lines = [
+            "",
+            rule,
+            "RESULT:",
+            rule,
+            f"Status: {result.get('status')}",
+            f"Total fetched: {result.get('total', 0)}",
+            f"Successfully inserted: {result.get('inserted', 0)}",
+        ]
+
+        if result.get("errors"):
+            lines.append(f"\nErrors: {result['errors']}")
+
+        if result.get("exchanges"):
+            lines.append("\nExchange rates fetched:")
+            lines.extend(
+                f"  - {ex['nombre']} ({ex['casa']}): Compra ${ex['compra']}, Venta ${ex['venta']}"
+                for ex in result["exchanges"]
+            )
+
+        lines.append(rule)
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+        sys.exit(0 if result.get("status") == "ok" else 1)
+
+    except Exception as e:
+        logger.exception("run_fetch failed")
+        print(f"\nERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db.close_pool()
+
+
+def batch_main():
+    """Fetch once with CLI-overridable connection options; print the result as JSON."""
+    setup_logging()
+    parser = argparse.ArgumentParser(
+        description="Fetch exchange rates from DolarAPI and store in PostgreSQL"
+    )
+    parser.add_argument(
+        "--db-host",
+        default=POSTGRES_HOST,
+        help="PostgreSQL host (default: localhost)",
+    )
+    parser.add_argument(
+        "--db-port",
+        default=POSTGRES_PORT,
+        help="PostgreSQL port (default: 5433)",
+    )
+    parser.add_argument(
+        "--db-name",
+        default=POSTGRES_DB,
+        help="Database name (default: wallbitdb)",
+    )
+    parser.add_argument(
+        "--db-user",
+        default=POSTGRES_USER,
+        help="Database user (default: wallbit)",
+    )
+    args = parser.parse_args()
+
+    dsn = build_dsn(args.db_user, POSTGRES_PASSWORD, args.db_host, args.db_port, args.db_name)
+
+    try:
+        db.init_pool(dsn)
+        result = fetch_and_store_exchange_rates()
+        print(json.dumps(result, indent=2))
+        sys.exit(0 if result.get("status") == "ok" else 1)
+    except Exception as e:
+        logger.exception("Batch process failed")
+        error_result = {"status": "error", "message": str(e)}
+        print(json.dumps(error_result, indent=2), file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db.close_pool()
@@ -2,27 +2,79 @@
 
 import logging
 import os
+from dataclasses import dataclass
 
 
-POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
-POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5433")
-POSTGRES_DB = os.getenv("POSTGRES_DB", "wallbitdb")
-POSTGRES_USER = os.getenv("POSTGRES_USER", "wallbit")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "wallbitpass")
+def build_dsn(user: str, password: str, host: str, port: str, db: str) -> str:
+    """Build a psycopg conninfo string; the single place the DSN format lives."""
+    return f"postgresql://{user}:{password}@{host}:{port}/{db}"
 
-DATABASE_DSN = (
-    f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
-    f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-)
 
-SCHEDULER_INTERVAL_HOURS = int(os.getenv("SCHEDULER_INTERVAL_HOURS", "2"))
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Immutable snapshot of the environment, parsed once at import.
 
-POOL_MIN_SIZE = int(os.getenv("POOL_MIN_SIZE", "2"))
-POOL_MAX_SIZE = int(os.getenv("POOL_MAX_SIZE", "10"))
+    Hot paths read plain attributes instead of hitting os.environ and
+    re-converting ints on every access.
+    """
 
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    postgres_host: str = os.getenv("POSTGRES_HOST", "localhost")
+    postgres_port: str = os.getenv("POSTGRES_PORT", "5433")
+    postgres_db: str = os.getenv("POSTGRES_DB", "wallbitdb")
+    postgres_user: str = os.getenv("POSTGRES_USER", "wallbit")
+    postgres_password: str = os.getenv("POSTGRES_PASSWORD", "wallbitpass")
 
-logging.basicConfig(
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    level=getattr(logging, LOG_LEVEL, logging.INFO),
-)
+    scheduler_interval_hours: int = int(os.getenv("SCHEDULER_INTERVAL_HOURS", "2"))
+
+    pool_min_size: int = int(os.getenv("POOL_MIN_SIZE", "2"))
+    pool_max_size: int = int(os.getenv("POOL_MAX_SIZE", "10"))
+
+    # psycopg prepares a statement server-side after this many executions;
+    # 0 prepares on first use so repeated INSERTs/SELECTs skip re-planning.
+    prepare_threshold: int = int(os.getenv("PREPARE_THRESHOLD", "0"))
+
+    log_level: str = os.getenv("LOG_LEVEL", "INFO").upper()
+
+    @property
+    def database_dsn(self) -> str:
+        return build_dsn(
+            self.postgres_user,
+            self.postgres_password,
+            self.postgres_host,
+            self.postgres_port,
+            self.postgres_db,
+        )
+
+
+settings = Settings()
+
+# Module-level aliases kept for existing importers.
+POSTGRES_HOST = settings.postgres_host
+POSTGRES_PORT = settings.postgres_port
+POSTGRES_DB = settings.postgres_db
+POSTGRES_USER = settings.postgres_user
+POSTGRES_PASSWORD = settings.postgres_password
+
+DATABASE_DSN = settings.database_dsn
+
+SCHEDULER_INTERVAL_HOURS = settings.scheduler_interval_hours
+
+POOL_MIN_SIZE = settings.pool_min_size
+POOL_MAX_SIZE = settings.pool_max_size
+
+PREPARE_THRESHOLD = settings.prepare_threshold
+
+LOG_LEVEL = settings.log_level
+
+
+def setup_logging():
+    """Configure root logging handlers once.
+
+    Called explicitly from the app lifespan and the CLI entry points
+    rather than as an import side effect, so importing config never
+    registers duplicate handlers.
+    """
+    logging.basicConfig(
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        level=getattr(logging, settings.log_level, logging.INFO),
+    )
@@ -1,26 +1,82 @@
-"""Small DB helper using psycopg connection pool.
+"""Small DB helper using psycopg connection pools.
 
 Expose:
-- pool: the ConnectionPool instance or None
-- init_pool(dsn): initialize the pool
-- close_pool(): close the pool
+- pool / async_pool: the (Async)ConnectionPool instance or None
+- init_pool(dsn) / init_async_pool(dsn): initialize the pools
+- close_pool() / close_async_pool(): close the pools
 - run_migration(sql_file_path): execute a SQL migration file
-- insert_exchange / get_exchanges: CRUD helpers for exchange_rates
+- insert_exchange / insert_exchanges_bulk / get_exchanges: CRUD helpers for exchange_rates
 """
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List
 from decimal import Decimal
 
-from .config import POOL_MIN_SIZE, POOL_MAX_SIZE
+from .config import POOL_MIN_SIZE, POOL_MAX_SIZE, PREPARE_THRESHOLD
 
 logger = logging.getLogger(__name__)
 
 pool = None
+async_pool = None
 
+# SQL hoisted to module constants so the hot helpers reuse the same string
+# objects (and psycopg's prepared-statement cache keys stay stable).
+_INSERT_SQL = """
+    INSERT INTO exchange_rates (type, buy, sell, rate, diff)
+    VALUES (%s, %s, %s, %s, %s)
+    RETURNING id
+"""
+_INSERT_RETURNING_SQL = """
+    INSERT INTO exchange_rates (type, buy, sell, rate, diff)
+    VALUES (%s, %s, %s, %s, %s)
+    RETURNING id, type, buy, sell, rate, diff, created_at
+"""
+_BULK_INSERT_PREFIX = "INSERT INTO exchange_rates (type, buy, sell, rate, diff) VALUES "
+_ROW_PLACEHOLDER = "(%s, %s, %s, %s, %s)"
+# Rows per multi-row INSERT statement. Keeps the parameter count well under
+# the wire-protocol cap (65535) and the statement/params buffers bounded no
+# matter how large the upstream payload grows.
+_BULK_CHUNK_ROWS = 500
+_COPY_SQL = "COPY exchange_rates (type, buy, sell, rate, diff) FROM STDIN"
+_MIGRATIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        name TEXT PRIMARY KEY,
+        applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+    )
+"""
+_MIGRATION_APPLIED_SQL = "SELECT 1 FROM schema_migrations WHERE name = %s"
+_MIGRATION_RECORD_SQL = "INSERT INTO schema_migrations (name) VALUES (%s)"
+_SELECT_SQL = "SELECT id, type, buy, sell, rate, diff, created_at FROM exchange_rates ORDER BY id DESC LIMIT %s"
+_SELECT_BY_ID_SQL = "SELECT id, type, buy, sell, rate, diff, created_at FROM exchange_rates WHERE id = %s"
+_SELECT_RECENT_SQL = "SELECT id, type, buy, sell, rate, diff, created_at FROM exchange_rates ORDER BY created_at DESC LIMIT %s"
+_VERSION_SQL = "SELECT MAX(id)::text || '-' || EXTRACT(epoch FROM MAX(created_at))::bigint::text FROM exchange_rates"
+
+
+def _configure_connection(conn):
+    """Run once per new pooled connection.
+
+    force_custom_plan keeps per-parameter planning for prepared
+    statements, avoiding PostgreSQL's switch to a potentially bad generic
+    plan after the fifth execution (Postgres 12+).
+    """
+    conn.execute("SET plan_cache_mode = 'force_custom_plan'")
+    conn.commit()
 
-def init_pool(dsn: str):
-    """Initialize a psycopg ConnectionPool with the provided DSN."""
+
+async def _configure_async_connection(conn):
+    """Async counterpart of _configure_connection."""
+    await conn.execute("SET plan_cache_mode = 'force_custom_plan'")
+    await conn.commit()
+
+
+def init_pool(dsn: str, min_size: int = POOL_MIN_SIZE, max_size: int = POOL_MAX_SIZE):
+    """Initialize a psycopg ConnectionPool with the provided DSN.
+
+    Pre-warms min_size connections so the first query does not pay the
+    TCP/TLS/auth handshake. Size the pool to expected concurrency (and
+    below PostgreSQL max_connections), not as large as possible.
+    """
     global pool
     try:
         from psycopg_pool import ConnectionPool
@@ -28,8 +84,20 @@ def init_pool(dsn: str):
         raise RuntimeError("psycopg_pool is required to use the DB") from e
 
     if pool is None:
-        pool = ConnectionPool(conninfo=dsn, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE)
-        logger.info("Connection pool created (min=%d, max=%d)", POOL_MIN_SIZE, POOL_MAX_SIZE)
+        pool = ConnectionPool(
+            conninfo=dsn,
+            min_size=min_size,
+            max_size=max_size,
+            kwargs={"prepare_threshold": PREPARE_THRESHOLD},
+            configure=_configure_connection,
+        )
+        try:
+            pool.wait(timeout=5.0)
+        except Exception:
+            # Keep the lazy behaviour if the DB is not up yet; connections
+            # will be established on first use instead.
+            logger.warning("Pool pre-warm timed out; connecting lazily")
+        logger.info("Connection pool created (min=%d, max=%d)", min_size, max_size)
 
 
 def close_pool():
@@ -41,6 +109,40 @@ def close_pool():
         pool = None
 
 
+async def init_async_pool(dsn: str, min_size: int = POOL_MIN_SIZE, max_size: int = POOL_MAX_SIZE):
+    """Initialize a psycopg AsyncConnectionPool with the provided DSN."""
+    global async_pool
+    try:
+        from psycopg_pool import AsyncConnectionPool
+    except Exception as e:
+        raise RuntimeError("psycopg_pool is required to use the DB") from e
+
+    if async_pool is None:
+        async_pool = AsyncConnectionPool(
+            conninfo=dsn,
+            min_size=min_size,
+            max_size=max_size,
+            kwargs={"prepare_threshold": PREPARE_THRESHOLD},
+            configure=_configure_async_connection,
+            open=False,
+        )
+        await async_pool.open()
+        try:
+            await async_pool.wait(timeout=5.0)
+        except Exception:
+            logger.warning("Async pool pre-warm timed out; connecting lazily")
+        logger.info("Async connection pool created (min=%d, max=%d)", min_size, max_size)
+
+
+async def close_async_pool():
+    global async_pool
+    try:
+        if async_pool is not None:
+            await async_pool.close()
+    finally:
+        async_pool = None
+
+
 # Helper to get a connection context manager. Usage:
 # with get_conn() as conn:
 #     with conn.cursor() as cur:
@@ -51,20 +153,65 @@ def get_pool():
     return pool
 
 
-def run_migration(sql_file_path: str):
-    """Run a SQL migration file. Raises exception if pool is not initialized."""
+def _require_pool():
+    """Return the sync pool, raising if it was never initialized.
+
+    Centralizes the None-check so hot helpers branch once per call (and
+    batch helpers once per batch) instead of re-checking in loops.
+    """
     if pool is None:
-        raise RuntimeError("DB pool not initialized; cannot run migration")
-    
-    sql_path = Path(sql_file_path)
-    if not sql_path.exists():
+        raise RuntimeError("DB pool not initialized")
+    return pool
+
+
+def _require_async_pool():
+    """Async-pool counterpart of _require_pool."""
+    if async_pool is None:
+        raise RuntimeError("DB async pool not initialized")
+    return async_pool
+
+
+@lru_cache(maxsize=16)
+def _read_sql(path: str) -> str:
+    """Read and memoize a SQL file's text so repeat runs skip disk I/O."""
+    return Path(path).read_text()
+
+
+def run_migration(sql_file_path: str):
+    """Run a SQL migration file once, tracked in schema_migrations.
+
+    Already-applied migrations cost one indexed SELECT in the steady
+    state. Fresh ones are applied under pg_advisory_xact_lock, so N
+    workers booting at once do not race to apply the same file; the
+    check is repeated under the lock before applying.
+
+    Raises if the pool is not initialized or the file does not exist.
+    """
+    p = _require_pool()
+
+    path = Path(sql_file_path)
+    if not path.exists():
         raise FileNotFoundError(f"Migration file not found: {sql_file_path}")
-    
-    sql = sql_path.read_text()
-    with pool.connection() as conn:
+    name = path.stem
+
+    with p.connection() as conn:
         with conn.cursor() as cur:
-            cur.execute(sql)
-            conn.commit()
+            cur.execute(_MIGRATIONS_TABLE_SQL)
+            cur.execute(_MIGRATION_APPLIED_SQL, (name,))
+            if cur.fetchone():
+                return
+        with conn.transaction():
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext('migrations'))")
+                cur.execute(_MIGRATION_APPLIED_SQL, (name,))
+                if cur.fetchone():
+                    return
+                # prepare=False: migration files may hold several
+                # statements, and a prepared Parse only accepts one — with
+                # prepare_threshold=0 a plain execute would prepare (and
+                # fail) on first use.
+                cur.execute(_read_sql(sql_file_path), prepare=False)
+                cur.execute(_MIGRATION_RECORD_SQL, (name,))
 
 
 def insert_exchange(
@@ -75,47 +222,159 @@ def insert_exchange(
     diff: Optional[Decimal] = None,
 ) -> int:
     """Insert a new exchange rate record and return the new ID."""
-    if pool is None:
-        raise RuntimeError("DB pool not initialized")
-    
-    with pool.connection() as conn:
+    p = _require_pool()
+
+    with p.connection() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO exchange_rates (type, buy, sell, rate, diff)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id
-                """,
-                (rate_type, buy, sell, rate, diff),
-            )
+            cur.execute(_INSERT_SQL, (rate_type, buy, sell, rate, diff))
             new_id = cur.fetchone()[0]
             conn.commit()
             return new_id
 
 
-def get_exchanges(limit: int = 100) -> List[tuple]:
-    """Fetch exchange rate records (returns list of tuples)."""
-    if pool is None:
-        raise RuntimeError("DB pool not initialized")
-    
-    with pool.connection() as conn:
+async def insert_exchange_returning_async(
+    rate_type: str,
+    buy: Optional[Decimal] = None,
+    sell: Optional[Decimal] = None,
+    rate: Optional[Decimal] = None,
+    diff: Optional[Decimal] = None,
+) -> tuple:
+    """Insert one record and return the full row in a single statement.
+
+    Collapses the insert_exchange + get_exchange_by_id pair into one
+    round-trip via RETURNING, so the write path pays one network hop
+    instead of two.
+    """
+    p = _require_async_pool()
+
+    async with p.connection() as conn:
+        async with conn.cursor(binary=True) as cur:
+            await cur.execute(_INSERT_RETURNING_SQL, (rate_type, buy, sell, rate, diff))
+            row = await cur.fetchone()
+            await conn.commit()
+            return row
+
+
+def insert_exchanges_bulk(rows: List[tuple]) -> int:
+    """Insert multiple exchange rate records in a single statement.
+
+    Each row is a (type, buy, sell, rate, diff) tuple. All rows go to the
+    server in one multi-row INSERT inside one transaction, instead of one
+    round-trip and commit per row. The job path discards the generated
+    IDs, so no RETURNING clause is sent and the row count is returned;
+    use insert_exchange when the new ID is needed.
+    """
+    p = _require_pool()
+    if not rows:
+        return 0
+
+    with p.connection() as conn:
         with conn.cursor() as cur:
-            cur.execute(
-                "SELECT id, type, buy, sell, rate, diff, created_at FROM exchange_rates ORDER BY id DESC LIMIT %s",
-                (limit,),
-            )
+            for start in range(0, len(rows), _BULK_CHUNK_ROWS):
+                chunk = rows[start:start + _BULK_CHUNK_ROWS]
+                placeholders = ", ".join([_ROW_PLACEHOLDER] * len(chunk))
+                params = [value for row in chunk for value in row]
+                cur.execute(_BULK_INSERT_PREFIX + placeholders, params)
+            conn.commit()
+            return len(rows)
+
+
+async def insert_exchanges_bulk_async(rows: List[tuple]) -> int:
+    """Async variant of insert_exchanges_bulk using the async pool."""
+    p = _require_async_pool()
+    if not rows:
+        return 0
+
+    async with p.connection() as conn:
+        async with conn.cursor() as cur:
+            for start in range(0, len(rows), _BULK_CHUNK_ROWS):
+                chunk = rows[start:start + _BULK_CHUNK_ROWS]
+                placeholders = ", ".join([_ROW_PLACEHOLDER] * len(chunk))
+                params = [value for row in chunk for value in row]
+                await cur.execute(_BULK_INSERT_PREFIX + placeholders, params)
+            await conn.commit()
+            return len(rows)
+
+
+def copy_insert_exchanges(rows: List[tuple]) -> int:
+    """Stream exchange rate rows to the server with the COPY protocol.
+
+    COPY skips per-row INSERT parsing/planning, so it beats a multi-row
+    INSERT for large batches. It cannot RETURNING ids, so the row count is
+    returned instead.
+    """
+    p = _require_pool()
+    if not rows:
+        return 0
+
+    with p.connection() as conn:
+        with conn.cursor() as cur:
+            with cur.copy(_COPY_SQL) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        conn.commit()
+    return len(rows)
+
+
+def get_exchanges(limit: int = 100) -> List[tuple]:
+    """Fetch exchange rate records (returns list of tuples).
+
+    Uses the binary protocol so numeric/timestamp columns skip the
+    text-format round-trip when being decoded.
+    """
+    p = _require_pool()
+
+    with p.connection() as conn:
+        with conn.cursor(binary=True) as cur:
+            cur.execute(_SELECT_SQL, (limit,))
+            return cur.fetchall()
+
+
+def get_exchanges_recent(limit: int = 100) -> List[tuple]:
+    """Fetch the most recent exchange rate records by created_at.
+
+    Ordered by created_at DESC so it can be served by the covering index
+    from migration 002 as an index-only scan.
+    """
+    p = _require_pool()
+
+    with p.connection() as conn:
+        with conn.cursor(binary=True) as cur:
+            cur.execute(_SELECT_RECENT_SQL, (limit,))
             return cur.fetchall()
 
 
+async def get_exchanges_recent_async(limit: int = 100) -> List[tuple]:
+    """Async variant of get_exchanges_recent using the async pool."""
+    p = _require_async_pool()
+
+    async with p.connection() as conn:
+        async with conn.cursor(binary=True) as cur:
+            await cur.execute(_SELECT_RECENT_SQL, (limit,))
+            return await cur.fetchall()
+
+
+async def get_exchanges_version_async() -> Optional[str]:
+    """Return an opaque version marker for the exchange_rates table.
+
+    Combines MAX(id) and MAX(created_at); both come from index ends, so
+    computing it is far cheaper than re-reading and serializing the rows
+    it stands in for. Returns None on an empty table.
+    """
+    p = _require_async_pool()
+
+    async with p.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(_VERSION_SQL)
+            row = await cur.fetchone()
+            return row[0] if row else None
+
+
 def get_exchange_by_id(exchange_id: int) -> Optional[tuple]:
     """Fetch a single exchange rate by ID."""
-    if pool is None:
-        raise RuntimeError("DB pool not initialized")
-    
-    with pool.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT id, type, buy, sell, rate, diff, created_at FROM exchange_rates WHERE id = %s",
-                (exchange_id,),
-            )
+    p = _require_pool()
+
+    with p.connection() as conn:
+        with conn.cursor(binary=True) as cur:
+            cur.execute(_SELECT_BY_ID_SQL, (exchange_id,))
             return cur.fetchone()
@@ -1,10 +1,20 @@
 """Data class for exchange rate responses from DolarAPI."""
+import sys
 from typing import Optional
 
+# The casa field only ever takes a handful of values; pre-interning them
+# makes equality checks pointer compares and dedupes the strings across
+# instances.
+_CASAS = {s: sys.intern(s) for s in (
+    "blue", "oficial", "ccl", "mep", "bolsa", "mayorista", "tarjeta", "cripto",
+)}
+
 
 class DolarApiRate:
     """Single exchange-rate record returned by DolarAPI."""
 
+    __slots__ = ("moneda", "nombre", "casa", "compra", "venta", "fechaActualizacion")
+
     def __init__(
         self,
         moneda: str,
@@ -16,7 +26,7 @@ class DolarApiRate:
     ) -> None:
         self.moneda = moneda
         self.nombre = nombre
-        self.casa = casa
+        self.casa = _CASAS.get(casa) or (sys.intern(casa) if type(casa) is str else casa)
         self.compra = compra
         self.venta = venta
         self.fechaActualizacion = fechaActualizacion
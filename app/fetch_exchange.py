@@ -1,86 +1,266 @@
 """Fetch exchange rate data from external API and store in database."""
 import logging
+import sys
 import httpx
+import orjson
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import List, Dict, Any
+from typing import Dict, Any, List, Tuple
 from . import db
-from .dolar_api import DolarApiRate
 
 logger = logging.getLogger(__name__)
 
+DOLAR_API_URL = "https://dolarapi.com/v1/dolares"
+
+# Shared client reused across fetches: keep-alive and HTTP/2 avoid paying a
+# fresh DNS + TCP + TLS handshake on every scheduled or manual run.
+_CLIENT = httpx.Client(
+    http2=True,
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=4),
+)
+_ASYNC_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=4),
+)
+
+
+async def close_http_clients():
+    """Close the shared HTTP clients (called on application shutdown)."""
+    _CLIENT.close()
+    await _ASYNC_CLIENT.aclose()
+
+
+# Batches larger than this go through the COPY protocol instead of a
+# multi-row INSERT; below it the INSERT is just as fast for one statement.
+COPY_BATCH_THRESHOLD = 100
+
+# Last ETag seen from DolarAPI. Sent back as If-None-Match so ticks where
+# upstream has not changed come back as a bodyless 304 — no JSON parse and
+# no DB work on the common unchanged path.
+_LAST_ETAG = None
+
+# Error templates bound once to str.format, so failing rows reuse the
+# compiled template instead of building a fresh f-string each time.
+_PARSE_ERR = "Error parsing {casa}: {err}".format
+_BATCH_ERR = "Error inserting batch: {err}".format
+
+
+def parse_iso_z(s: str) -> datetime:
+    """Parse DolarAPI's fixed-layout "YYYY-MM-DDTHH:MM:SS.mmmZ" timestamps.
+
+    The layout is fixed-width, so plain integer slicing replaces the
+    general fromisoformat tokenizer (which also rejects the trailing Z
+    before Python 3.11). Use this for fechaActualizacion values.
+    """
+    return datetime(
+        int(s[0:4]), int(s[5:7]), int(s[8:10]),
+        int(s[11:13]), int(s[14:16]), int(s[17:19]),
+        int(s[20:23]) * 1000,
+        tzinfo=timezone.utc,
+    )
+
+
+def _intern(value):
+    """Intern repeated short API strings ("blue", "oficial", ...).
+
+    The accumulated response dicts and DB rows then share one copy per
+    distinct value instead of N duplicates per fetch.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+def _cents(value) -> int:
+    """Scale an API numeric to integer cents.
+
+    DolarAPI quotes at most two decimals, so the scaling is exact; ints
+    skip the float round-trip entirely.
+    """
+    if isinstance(value, int):
+        return value * 100
+    return int(round(float(value) * 100))
+
+
+def _from_cents(cents: int) -> Decimal:
+    """Rebuild a Decimal (two decimal places) from integer cents."""
+    return Decimal(cents).scaleb(-2)
+
+
+def _parse_rates(data: List[dict]) -> Tuple[List[dict], List[tuple], List[str]]:
+    """Parse API items into response dicts and DB row tuples in one pass.
+
+    Works directly on the JSON dicts instead of allocating a DolarApiRate
+    per item just to read its attributes back. Returns (exchanges, rows,
+    errors); items that fail to parse are reported in errors and skipped.
+    """
+    exchanges = []
+    rows = []
+    errors = []
+
+    for item in data:
+        try:
+            casa = _intern(item.get("casa", "unknown"))
+
+            # Map API fields to DB schema
+            # type = casa (official, blue, etc.)
+            # buy = compra
+            # sell = venta
+            # rate = average of buy/sell
+            # diff = sell - buy
+
+            # The arithmetic runs on integer cents — int add/shift instead
+            # of four Decimal allocations per row. Decimal reappears only
+            # in the tuple handed to the DB layer.
+            buy_c = _cents(item.get("compra", 0))
+            sell_c = _cents(item.get("venta", 0))
+            rate_c = (buy_c + sell_c) // 2
+            diff_c = sell_c - buy_c
+
+            rows.append((
+                casa,
+                _from_cents(buy_c),
+                _from_cents(sell_c),
+                _from_cents(rate_c),
+                _from_cents(diff_c),
+            ))
+            exchanges.append({
+                "moneda": _intern(item.get("moneda", "USD")),
+                "nombre": item.get("nombre", ""),
+                "casa": casa,
+                "compra": item.get("compra", 0),
+                "venta": item.get("venta", 0),
+                "fechaActualizacion": item.get("fechaActualizacion", "")
+            })
+
+        except Exception as e:
+            logger.warning("Failed to parse rate for %s: %s", item.get("casa", "unknown"), e)
+            errors.append(_PARSE_ERR(casa=item.get("casa", "unknown"), err=e))
+
+    return exchanges, rows, errors
+
+
+def _not_modified_result() -> Dict[str, Any]:
+    """Result returned when upstream answers 304 Not Modified."""
+    return {
+        "status": "ok",
+        "inserted": 0,
+        "total": 0,
+        "exchanges": [],
+        "errors": None,
+        "cached": True,
+    }
+
+
+def _build_result(total: int, exchanges: List[dict], inserted_count: int,
+                  errors: List[str]) -> Dict[str, Any]:
+    """Assemble the result dict shared by the sync and async fetch paths."""
+    return {
+        "status": "ok",
+        "inserted": inserted_count,
+        "total": total,
+        "exchanges": exchanges,
+        "errors": errors if errors else None
+    }
+
 
 def fetch_and_store_exchange_rates() -> Dict[str, Any]:
     """
     Fetch exchange rates from dolarapi.com and store them in the database.
-    
+
     Returns a dict with status and count of records inserted.
     """
+    global _LAST_ETAG
     try:
-        # Fetch data from external API
-        response = httpx.get("https://dolarapi.com/v1/dolares", timeout=10.0)
+        # Fetch data from external API over the shared keep-alive client,
+        # conditionally when a previous response carried an ETag
+        if _LAST_ETAG:
+            response = _CLIENT.get(DOLAR_API_URL, headers={"If-None-Match": _LAST_ETAG})
+        else:
+            response = _CLIENT.get(DOLAR_API_URL)
+        if response.status_code == 304:
+            return _not_modified_result()
         response.raise_for_status()
-        data = response.json()
-        
+        _LAST_ETAG = response.headers.get("etag")
+        data = orjson.loads(response.content)
+
+        exchanges, rows, errors = _parse_rates(data)
+
+        # One batch write in one transaction instead of a round-trip per row.
+        # Small batches use a multi-row INSERT; large ones stream via COPY.
         inserted_count = 0
-        errors = []
-        exchanges = []
-        
-        # Create Exchange objects and insert each exchange rate into the database
-        for item in data:
+        if rows:
             try:
-                # Create Exchange object with API data
-                exchange = DolarApiRate(
-                    moneda=item.get("moneda", "USD"),
-                    nombre=item.get("nombre", ""),
-                    casa=item.get("casa", "unknown"),
-                    compra=item.get("compra", 0),
-                    venta=item.get("venta", 0),
-                    fechaActualizacion=item.get("fechaActualizacion", "")
-                )
-                exchanges.append(exchange)
-                
-                # Map Exchange object to DB schema
-                # type = casa (official, blue, etc.)
-                # buy = compra
-                # sell = venta
-                # rate = average of buy/sell
-                # diff = sell - buy
-                
-                buy = Decimal(str(exchange.compra))
-                sell = Decimal(str(exchange.venta))
-                rate = (buy + sell) / 2
-                diff = sell - buy
-                
-                db.insert_exchange(exchange.casa, buy, sell, rate, diff)
-                inserted_count += 1
-                
+                if len(rows) > COPY_BATCH_THRESHOLD:
+                    db.copy_insert_exchanges(rows)
+                else:
+                    db.insert_exchanges_bulk(rows)
+                inserted_count = len(rows)
             except Exception as e:
-                logger.warning("Failed to insert rate for %s: %s", item.get("casa", "unknown"), e)
-                errors.append(f"Error inserting {item.get('casa', 'unknown')}: {str(e)}")
-        
+                logger.warning("Failed to insert batch of %d rates: %s", len(rows), e)
+                errors.append(_BATCH_ERR(err=e))
+
+        return _build_result(len(data), exchanges, inserted_count, errors)
+
+    except httpx.HTTPError as e:
         return {
-            "status": "ok",
-            "inserted": inserted_count,
-            "total": len(data),
-            "exchanges": [
-                {
-                    "moneda": ex.moneda,
-                    "nombre": ex.nombre,
-                    "casa": ex.casa,
-                    "compra": ex.compra,
-                    "venta": ex.venta,
-                    "fechaActualizacion": ex.fechaActualizacion
-                }
-                for ex in exchanges
-            ],
-            "errors": errors if errors else None
+            "status": "error",
+            "message": f"HTTP error fetching data: {str(e)}"
+        }
+    except orjson.JSONDecodeError as e:
+        return {
+            "status": "error",
+            "message": f"Invalid JSON in response: {str(e)}"
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error: {str(e)}"
         }
-        
+
+
+async def fetch_and_store_exchange_rates_async() -> Dict[str, Any]:
+    """
+    Async variant of fetch_and_store_exchange_rates.
+
+    Fetches with httpx.AsyncClient and writes through the async pool so
+    neither the HTTP round-trip nor the batch insert blocks the event loop.
+    """
+    global _LAST_ETAG
+    try:
+        if _LAST_ETAG:
+            response = await _ASYNC_CLIENT.get(DOLAR_API_URL, headers={"If-None-Match": _LAST_ETAG})
+        else:
+            response = await _ASYNC_CLIENT.get(DOLAR_API_URL)
+        if response.status_code == 304:
+            return _not_modified_result()
+        response.raise_for_status()
+        _LAST_ETAG = response.headers.get("etag")
+        data = orjson.loads(response.content)
+
+        exchanges, rows, errors = _parse_rates(data)
+
+        inserted_count = 0
+        if rows:
+            try:
+                await db.insert_exchanges_bulk_async(rows)
+                inserted_count = len(rows)
+            except Exception as e:
+                logger.warning("Failed to insert batch of %d rates: %s", len(rows), e)
+                errors.append(_BATCH_ERR(err=e))
+
+        return _build_result(len(data), exchanges, inserted_count, errors)
+
     except httpx.HTTPError as e:
         return {
             "status": "error",
             "message": f"HTTP error fetching data: {str(e)}"
         }
+    except orjson.JSONDecodeError as e:
+        return {
+            "status": "error",
+            "message": f"Invalid JSON in response: {str(e)}"
+        }
     except Exception as e:
         return {
             "status": "error",
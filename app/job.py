@@ -7,7 +7,10 @@ into the exchange_rates table.
 import logging
 
 from . import db as _db
-from .fetch_exchange import fetch_and_store_exchange_rates
+from .fetch_exchange import (
+    fetch_and_store_exchange_rates,
+    fetch_and_store_exchange_rates_async,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +31,30 @@ def run_job(data=None):
         return {"status": "error", "message": f"Job failed: {str(e)}"}
 
 
+async def run_job_async(data=None):
+    """Async variant of run_job used by the async API endpoints.
+
+    Awaits the async fetch/store coroutine instead of blocking a
+    threadpool worker.
+    """
+    try:
+        result = await fetch_and_store_exchange_rates_async()
+        return result
+    except Exception as e:
+        logger.exception("Job failed")
+        return {"status": "error", "message": f"Job failed: {str(e)}"}
+
+
 def scheduled_task():
     """Task intended to be scheduled by a scheduler (e.g., APScheduler).
     Fetches exchange rates periodically.
     """
     return run_job("scheduled")
+
+
+async def scheduled_task_async():
+    """Coroutine scheduled on the event loop by AsyncIOScheduler.
+
+    Runs the fetch job without hopping through a scheduler thread.
+    """
+    return await run_job_async("scheduled")
@@ -7,19 +7,23 @@ This application provides endpoints to:
 - Schedule automatic fetching every 2 hours
 """
 import logging
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException
-from apscheduler.schedulers.background import BackgroundScheduler
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from .config import DATABASE_DSN, SCHEDULER_INTERVAL_HOURS
-from .job import run_job, scheduled_task
+from .config import DATABASE_DSN, SCHEDULER_INTERVAL_HOURS, setup_logging
+from .job import run_job_async, scheduled_task_async
 from . import db
 from .models import Exchange
-from .fetch_exchange import fetch_and_store_exchange_rates
+from .fetch_exchange import fetch_and_store_exchange_rates_async, close_http_clients
 from .schemas import (
+    ExchangeCreate,
+    ExchangeCreateResponse,
     ExchangeListResponse,
     FetchExchangeResponse,
     ErrorResponse,
@@ -27,30 +31,50 @@ from .schemas import (
 
 logger = logging.getLogger(__name__)
 
-# scheduler for periodic tasks
-scheduler = BackgroundScheduler()
+# scheduler for periodic tasks; runs jobs as coroutines on the app's event loop
+scheduler = AsyncIOScheduler()
+
+# Rates change at most once per scheduler interval, so repeated reads within
+# the TTL skip the SELECT and re-serialization entirely. Writes invalidate.
+_EXCHANGE_CACHE_TTL = 60.0
+_exchange_cache = None  # (monotonic timestamp, payload dict, etag) or None
+
+
+def _invalidate_exchange_cache():
+    global _exchange_cache
+    _exchange_cache = None
+
+
+async def _scheduled_fetch():
+    """Scheduled wrapper that drops the read cache after each run."""
+    result = await scheduled_task_async()
+    _invalidate_exchange_cache()
+    return result
 
 
 @asynccontextmanager
 async def lifespan(application: FastAPI):
     """Manage startup / shutdown resources."""
     # ── startup ──
+    setup_logging()
     try:
         db.init_pool(DATABASE_DSN)
+        await db.init_async_pool(DATABASE_DSN)
         migrations_dir = Path(__file__).parent.parent / "migrations"
-        migration_file = migrations_dir / "001_create_exchange_rates.sql"
-        if migration_file.exists():
+        for migration_file in sorted(migrations_dir.glob("*.sql")):
             db.run_migration(str(migration_file))
     except Exception:
         logger.warning("Database unavailable at startup", exc_info=True)
 
     try:
         scheduler.add_job(
-            scheduled_task,
+            _scheduled_fetch,
             "interval",
             hours=SCHEDULER_INTERVAL_HOURS,
             id="scheduled_exchange_fetch",
             replace_existing=True,
+            coalesce=True,
+            max_instances=1,
         )
         scheduler.start()
     except Exception:
@@ -63,6 +87,14 @@ async def lifespan(application: FastAPI):
         scheduler.shutdown(wait=False)
     except Exception:
         pass
+    try:
+        await close_http_clients()
+    except Exception:
+        pass
+    try:
+        await db.close_async_pool()
+    except Exception:
+        pass
     try:
         db.close_pool()
     except Exception:
@@ -126,12 +158,15 @@ real-time Argentine peso exchange rates.
         },
     ],
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
 @app.get(
     "/api/exchange",
-    response_model=ExchangeListResponse,
+    # response_model skipped on purpose: the rows are already dicts in the
+    # documented shape, and Pydantic re-validation per row is pure overhead.
+    response_model=None,
     tags=["Exchange Rates"],
     summary="Get all exchange rates",
     description="""
@@ -151,20 +186,78 @@ real-time Argentine peso exchange rates.
         },
     },
 )
-def get_exchange():
+async def get_exchange(request: Request, response: Response):
     """Get all exchange rates from the database."""
+    global _exchange_cache
+    if_none_match = request.headers.get("if-none-match")
+
+    cached = _exchange_cache
+    if cached is not None and time.monotonic() - cached[0] < _EXCHANGE_CACHE_TTL:
+        etag = cached[2]
+        if etag is not None and if_none_match == etag:
+            return Response(status_code=304)
+        if etag is not None:
+            response.headers["ETag"] = etag
+        return cached[1]
+
     try:
-        rows = db.get_exchanges(limit=100)
-        exchanges = [Exchange.from_row(row).to_dict() for row in rows]
-        return {"status": "ok", "data": exchanges}
+        # One MAX() lookup decides whether the client (or our cache) is
+        # stale before paying for the 100-row fetch and serialization.
+        version = await db.get_exchanges_version_async()
+        etag = f'W/"{version}"' if version is not None else None
+        if etag is not None and if_none_match == etag:
+            return Response(status_code=304)
+
+        rows = await db.get_exchanges_recent_async(limit=100)
+        exchanges = [Exchange.row_to_dict(row) for row in rows]
+        payload = {"status": "ok", "data": exchanges}
+        _exchange_cache = (time.monotonic(), payload, etag)
+        if etag is not None:
+            response.headers["ETag"] = etag
+        return payload
     except Exception as e:
         logger.exception("Failed to retrieve exchange rates")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post(
+    "/api/exchange",
+    response_model=None,
+    tags=["Exchange Rates"],
+    summary="Create an exchange rate record",
+    description="""
+    Manually insert a single exchange rate record.
+
+    The record is written and read back in one statement (INSERT ... RETURNING),
+    so the response carries the server-assigned id and created_at timestamp.
+    """,
+    responses={
+        200: {
+            "description": "Exchange rate created",
+            "model": ExchangeCreateResponse,
+        },
+        500: {
+            "description": "Internal server error",
+            "model": ErrorResponse,
+        },
+    },
+)
+async def create_exchange(payload: ExchangeCreate):
+    """Create a single exchange rate record."""
+    try:
+        row = await db.insert_exchange_returning_async(
+            payload.type, payload.buy, payload.sell, payload.rate, payload.diff
+        )
+        _invalidate_exchange_cache()
+        return {"status": "ok", "data": Exchange.row_to_dict(row)}
+    except Exception as e:
+        logger.exception("Failed to create exchange rate")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post(
     "/run-job",
-    response_model=FetchExchangeResponse,
+    response_model=None,
     tags=["Jobs"],
     summary="Execute the exchange rate fetching job",
     description="""
@@ -191,15 +284,16 @@ def get_exchange():
         },
     },
 )
-def run_job_endpoint(payload: Optional[dict] = None):
-    """Run the job synchronously with optional JSON payload."""
-    result = run_job(payload)
+async def run_job_endpoint(payload: Optional[dict] = None):
+    """Run the job on the event loop with optional JSON payload."""
+    result = await run_job_async(payload)
+    _invalidate_exchange_cache()
     return result
 
 
 @app.post(
     "/api/exchange/fetch",
-    response_model=FetchExchangeResponse,
+    response_model=None,
     tags=["Data Fetching"],
     summary="Fetch exchange rates from DolarAPI",
     description="""
@@ -235,9 +329,10 @@ def run_job_endpoint(payload: Optional[dict] = None):
         },
     },
 )
-def fetch_exchange_rates():
+async def fetch_exchange_rates():
     """Fetch exchange rates from dolarapi.com and store them in the database."""
-    result = fetch_and_store_exchange_rates()
+    result = await fetch_and_store_exchange_rates_async()
+    _invalidate_exchange_cache()
     if result.get("status") == "error":
         raise HTTPException(status_code=502, detail=result.get("message", "Upstream fetch failed"))
     return result
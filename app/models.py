@@ -7,6 +7,8 @@ from datetime import datetime
 class Exchange:
     """Exchange rate model mapping to exchange_rates table."""
 
+    __slots__ = ("id", "type", "buy", "sell", "rate", "diff", "created_at")
+
     def __init__(
         self,
         id: Optional[int] = None,
@@ -37,6 +39,26 @@ class Exchange:
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
 
+    @staticmethod
+    def row_to_dict(row):
+        """Serialize a DB row straight to a response dict.
+
+        Fuses from_row + to_dict so list endpoints skip allocating an
+        Exchange instance per row.
+        """
+        if not row:
+            return None
+        _float = float  # local bind: one global lookup instead of four per row
+        return {
+            "id": row[0],
+            "type": row[1],
+            "buy": _float(row[2]) if row[2] is not None else None,
+            "sell": _float(row[3]) if row[3] is not None else None,
+            "rate": _float(row[4]) if row[4] is not None else None,
+            "diff": _float(row[5]) if row[5] is not None else None,
+            "created_at": row[6].isoformat() if len(row) > 6 and row[6] else None,
+        }
+
     @classmethod
     def from_row(cls, row):
         """Create an Exchange instance from a DB row tuple."""
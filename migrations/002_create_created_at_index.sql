@@ -0,0 +1,6 @@
+-- Migration: covering index for recency queries on exchange_rates
+-- Lets ORDER BY created_at DESC LIMIT N run as an index-only scan
+
+CREATE INDEX IF NOT EXISTS idx_exchange_rates_created_at_desc
+    ON exchange_rates (created_at DESC)
+    INCLUDE (id, type, buy, sell, rate, diff);
@@ -0,0 +1,42 @@
+"""Shared lightweight stubs for the fetch tests.
+
+Plain classes instead of MagicMock: no dynamic attribute machinery is
+built per test, and monkeypatch restores attributes without a patcher
+stack.
+"""
+import orjson
+
+
+class FakeResponse:
+    """Minimal stand-in for an httpx.Response."""
+
+    def __init__(self, content: bytes, status_code: int = 200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        return None
+
+
+def make_resp(payload) -> FakeResponse:
+    """Build a FakeResponse carrying the orjson-encoded payload."""
+    return FakeResponse(orjson.dumps(payload))
+
+
+class RecordingInsert:
+    """Callable stub for the bulk insert; records each rows argument.
+
+    Returns `result` per call, or raises `error` if one is given.
+    """
+
+    def __init__(self, result=0, error=None):
+        self.calls = []
+        self.result = result
+        self.error = error
+
+    def __call__(self, rows):
+        self.calls.append(rows)
+        if self.error is not None:
+            raise self.error
+        return self.result
@@ -0,0 +1,114 @@
+"""Tests for the migration runner in app.db."""
+import pytest
+
+from app import db
+
+
+class FakeCursor:
+    """Records executed statements on the owning connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None, prepare=None):
+        self.conn.executed.append((" ".join(sql.split()), params, prepare))
+        return self
+
+    def fetchone(self):
+        sql, params, _ = self.conn.executed[-1]
+        if "FROM schema_migrations" in sql:
+            return (1,) if params and params[0] in self.conn.applied else None
+        return None
+
+
+class FakeTransaction:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    """Connection stub backed by a set of already-applied migration names."""
+
+    def __init__(self, applied=()):
+        self.applied = set(applied)
+        self.executed = []
+
+    def cursor(self, binary=False):
+        return FakeCursor(self)
+
+    def transaction(self):
+        return FakeTransaction()
+
+    def commit(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def connection(self):
+        conn = self._conn
+
+        class _Ctx:
+            def __enter__(self):
+                return conn
+
+            def __exit__(self, *exc):
+                return False
+
+        return _Ctx()
+
+
+class TestRunMigration:
+    """Test suite for db.run_migration."""
+
+    def test_applies_fresh_multi_statement_file(self, tmp_path, monkeypatch):
+        """A new migration is executed unprepared and then recorded."""
+        sql_file = tmp_path / "001_test.sql"
+        sql_file.write_text("CREATE TABLE t (id int); CREATE INDEX i ON t (id);")
+        conn = FakeConnection()
+        monkeypatch.setattr(db, "pool", FakePool(conn))
+
+        db.run_migration(str(sql_file))
+
+        bodies = [e for e in conn.executed if "CREATE TABLE t" in e[0]]
+        assert len(bodies) == 1
+        # The file holds two statements; preparing it would fail under
+        # prepare_threshold=0, so the body must opt out.
+        assert bodies[0][2] is False
+
+        records = [e for e in conn.executed if "INSERT INTO schema_migrations" in e[0]]
+        assert len(records) == 1
+        assert records[0][1] == ("001_test",)
+
+    def test_skips_already_applied_migration(self, tmp_path, monkeypatch):
+        """A recorded migration returns after the bookkeeping SELECT."""
+        sql_file = tmp_path / "001_test.sql"
+        sql_file.write_text("CREATE TABLE t (id int);")
+        conn = FakeConnection(applied={"001_test"})
+        monkeypatch.setattr(db, "pool", FakePool(conn))
+
+        db.run_migration(str(sql_file))
+
+        assert not any("CREATE TABLE t" in e[0] for e in conn.executed)
+        assert not any("INSERT INTO schema_migrations" in e[0] for e in conn.executed)
+
+    def test_missing_file_raises(self, monkeypatch):
+        """A nonexistent migration path raises before touching the DB."""
+        conn = FakeConnection()
+        monkeypatch.setattr(db, "pool", FakePool(conn))
+
+        with pytest.raises(FileNotFoundError):
+            db.run_migration("/nonexistent/999_missing.sql")
+
+        assert conn.executed == []
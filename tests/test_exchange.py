@@ -45,3 +45,16 @@ def test_exchange_from_row():
     assert ex.type == "GBP"
     assert ex.buy == Decimal("120.00")
     assert ex.sell == Decimal("121.00")
+
+
+def test_exchange_row_to_dict():
+    """Test Exchange.row_to_dict() serializes a DB row without an instance."""
+    row = (4, "blue", Decimal("1415.00"), Decimal("1435.00"), Decimal("1425.00"), Decimal("20.00"), None)
+    data = Exchange.row_to_dict(row)
+    assert data["id"] == 4
+    assert data["type"] == "blue"
+    assert data["buy"] == 1415.0
+    assert data["sell"] == 1435.0
+    assert data["rate"] == 1425.0
+    assert data["diff"] == 20.0
+    assert data["created_at"] is None
@@ -1,40 +1,53 @@
 """Tests for exchange rate fetching from DolarAPI."""
+import httpx
 import pytest
+import orjson
 from unittest.mock import patch, MagicMock
 from decimal import Decimal
-from app.fetch_exchange import fetch_and_store_exchange_rates
+from app.fetch_exchange import (
+    fetch_and_store_exchange_rates,
+    fetch_and_store_exchange_rates_async,
+    parse_iso_z,
+)
 from app.dolar_api import DolarApiRate
 
+from .conftest import make_resp, FakeResponse, RecordingInsert
+
+# Shared payloads for the fetch tests; individual tests override fields
+# via dict(PAYLOAD_BLUE, ...) instead of restating the whole item.
+PAYLOAD_BLUE = {
+    "moneda": "USD",
+    "casa": "blue",
+    "nombre": "Blue",
+    "compra": 1415,
+    "venta": 1435,
+    "fechaActualizacion": "2025-11-06T19:58:00.000Z"
+}
+PAYLOAD_OFICIAL = {
+    "moneda": "USD",
+    "casa": "oficial",
+    "nombre": "Oficial",
+    "compra": 1425,
+    "venta": 1475,
+    "fechaActualizacion": "2025-11-05T17:00:00.000Z"
+}
+
 
 class TestFetchExchange:
     """Test suite for exchange rate fetching functionality."""
 
-    @patch('app.fetch_exchange.httpx.get')
-    @patch('app.fetch_exchange.db.insert_exchange')
-    def test_fetch_and_store_success(self, mock_insert, mock_get):
+    def test_fetch_and_store_success(self, monkeypatch):
         """Test successful fetch and store of exchange rates."""
-        # Mock API response
-        mock_response = MagicMock()
-        mock_response.json.return_value = [
-            {
-                "moneda": "USD",
-                "casa": "blue",
-                "nombre": "Blue",
-                "compra": 1415,
-                "venta": 1435,
-                "fechaActualizacion": "2025-11-06T19:58:00.000Z"
-            },
-            {
-                "moneda": "USD",
-                "casa": "oficial",
-                "nombre": "Oficial",
-                "compra": 1425,
-                "venta": 1475,
-                "fechaActualizacion": "2025-11-05T17:00:00.000Z"
-            }
-        ]
-        mock_get.return_value = mock_response
-        mock_insert.return_value = 1
+        payload = [PAYLOAD_BLUE, PAYLOAD_OFICIAL]
+        urls = []
+
+        def fake_get(url):
+            urls.append(url)
+            return make_resp(payload)
+
+        insert = RecordingInsert(result=2)
+        monkeypatch.setattr("app.fetch_exchange._CLIENT.get", fake_get)
+        monkeypatch.setattr("app.fetch_exchange.db.insert_exchanges_bulk", insert)
 
         result = fetch_and_store_exchange_rates()
 
@@ -43,57 +56,37 @@ class TestFetchExchange:
         assert result["total"] == 2
         assert len(result["exchanges"]) == 2
         assert result["errors"] is None
-        
+
         # Verify API was called correctly
-        mock_get.assert_called_once_with(
-            "https://dolarapi.com/v1/dolares",
-            timeout=10.0
-        )
-        
-        # Verify insert was called twice
-        assert mock_insert.call_count == 2
-
-    @patch('app.fetch_exchange.httpx.get')
-    @patch('app.fetch_exchange.db.insert_exchange')
-    def test_fetch_with_partial_errors(self, mock_insert, mock_get):
-        """Test fetching when some inserts fail."""
-        mock_response = MagicMock()
-        mock_response.json.return_value = [
-            {
-                "moneda": "USD",
-                "casa": "blue",
-                "nombre": "Blue",
-                "compra": 1415,
-                "venta": 1435,
-                "fechaActualizacion": "2025-11-06T19:58:00.000Z"
-            },
-            {
-                "moneda": "USD",
-                "casa": "oficial",
-                "nombre": "Oficial",
-                "compra": 1425,
-                "venta": 1475,
-                "fechaActualizacion": "2025-11-05T17:00:00.000Z"
-            }
-        ]
-        mock_get.return_value = mock_response
-        
-        # First insert succeeds, second fails
-        mock_insert.side_effect = [1, Exception("DB error")]
+        assert urls == ["https://dolarapi.com/v1/dolares"]
+
+        # Verify both rows went out in a single batch insert
+        assert len(insert.calls) == 1
+        assert len(insert.calls[0]) == 2
+
+    def test_fetch_with_insert_error(self, monkeypatch):
+        """Test fetching when the batch insert fails."""
+        payload = [PAYLOAD_BLUE, PAYLOAD_OFICIAL]
+        monkeypatch.setattr("app.fetch_exchange._CLIENT.get", lambda url: make_resp(payload))
+
+        # The whole batch fails in one transaction
+        insert = RecordingInsert(error=Exception("DB error"))
+        monkeypatch.setattr("app.fetch_exchange.db.insert_exchanges_bulk", insert)
 
         result = fetch_and_store_exchange_rates()
 
         assert result["status"] == "ok"
-        assert result["inserted"] == 1
+        assert result["inserted"] == 0
         assert result["total"] == 2
         assert len(result["errors"]) == 1
-        assert "oficial" in result["errors"][0]
+        assert "DB error" in result["errors"][0]
 
-    @patch('app.fetch_exchange.httpx.get')
-    def test_fetch_http_error(self, mock_get):
+    def test_fetch_http_error(self, monkeypatch):
         """Test handling of HTTP errors."""
-        import httpx
-        mock_get.side_effect = httpx.HTTPError("Connection failed")
+        def fake_get(url):
+            raise httpx.HTTPError("Connection failed")
+
+        monkeypatch.setattr("app.fetch_exchange._CLIENT.get", fake_get)
 
         result = fetch_and_store_exchange_rates()
 
@@ -101,35 +94,44 @@ class TestFetchExchange:
         assert "HTTP error" in result["message"]
         assert "Connection failed" in result["message"]
 
-    @patch('app.fetch_exchange.httpx.get')
-    def test_fetch_json_parse_error(self, mock_get):
+    def test_fetch_json_parse_error(self, monkeypatch):
         """Test handling of JSON parsing errors."""
-        mock_response = MagicMock()
-        mock_response.json.side_effect = ValueError("Invalid JSON")
-        mock_get.return_value = mock_response
+        monkeypatch.setattr(
+            "app.fetch_exchange._CLIENT.get", lambda url: FakeResponse(b"not json")
+        )
 
         result = fetch_and_store_exchange_rates()
 
         assert result["status"] == "error"
         assert "Invalid JSON" in result["message"]
 
-    @patch('app.fetch_exchange.httpx.get')
-    @patch('app.fetch_exchange.db.insert_exchange')
-    def test_exchange_object_creation(self, mock_insert, mock_get):
+    def test_fetch_304_shortcircuit(self, monkeypatch):
+        """Test that an upstream 304 skips parsing and inserts entirely."""
+        sent = {}
+
+        def fake_get(url, headers=None):
+            sent["headers"] = headers
+            return FakeResponse(b"", status_code=304)
+
+        insert = RecordingInsert(result=1)
+        monkeypatch.setattr("app.fetch_exchange._LAST_ETAG", '"abc123"')
+        monkeypatch.setattr("app.fetch_exchange._CLIENT.get", fake_get)
+        monkeypatch.setattr("app.fetch_exchange.db.insert_exchanges_bulk", insert)
+
+        result = fetch_and_store_exchange_rates()
+
+        assert result["status"] == "ok"
+        assert result["cached"] is True
+        assert result["inserted"] == 0
+        assert result["total"] == 0
+        assert sent["headers"] == {"If-None-Match": '"abc123"'}
+        assert insert.calls == []
+
+    def test_exchange_object_creation(self, monkeypatch):
         """Test that Exchange objects are created correctly."""
-        mock_response = MagicMock()
-        mock_response.json.return_value = [
-            {
-                "moneda": "USD",
-                "casa": "blue",
-                "nombre": "Blue",
-                "compra": 1415.5,
-                "venta": 1435.5,
-                "fechaActualizacion": "2025-11-06T19:58:00.000Z"
-            }
-        ]
-        mock_get.return_value = mock_response
-        mock_insert.return_value = 1
+        payload = [dict(PAYLOAD_BLUE, compra=1415.5, venta=1435.5)]
+        monkeypatch.setattr("app.fetch_exchange._CLIENT.get", lambda url: make_resp(payload))
+        monkeypatch.setattr("app.fetch_exchange.db.insert_exchanges_bulk", RecordingInsert(result=1))
 
         result = fetch_and_store_exchange_rates()
 
@@ -141,37 +143,92 @@ class TestFetchExchange:
         assert exchange_data["compra"] == 1415.5
         assert exchange_data["venta"] == 1435.5
 
-    @patch('app.fetch_exchange.httpx.get')
-    @patch('app.fetch_exchange.db.insert_exchange')
-    def test_rate_calculation(self, mock_insert, mock_get):
+    @pytest.mark.parametrize(
+        "compra,venta,exp_rate,exp_diff",
+        [
+            (1400, 1600, Decimal("1500"), Decimal("200")),
+            (1415.5, 1435.5, Decimal("1425.50"), Decimal("20.00")),
+            (1000, 1001, Decimal("1000.50"), Decimal("1.00")),
+        ],
+    )
+    def test_rate_calculation(self, monkeypatch, compra, venta, exp_rate, exp_diff):
         """Test that rate and diff are calculated correctly."""
+        payload = [dict(PAYLOAD_BLUE, compra=compra, venta=venta)]
+        insert = RecordingInsert(result=1)
+        monkeypatch.setattr("app.fetch_exchange._CLIENT.get", lambda url: make_resp(payload))
+        monkeypatch.setattr("app.fetch_exchange.db.insert_exchanges_bulk", insert)
+
+        result = fetch_and_store_exchange_rates()
+
+        # Verify the batch row carries the correct calculated values
+        rows = insert.calls[0]
+        _, buy, sell, rate, diff = rows[0]
+
+        assert buy == Decimal(str(compra))
+        assert sell == Decimal(str(venta))
+        assert rate == exp_rate  # (compra + venta) / 2
+        assert diff == exp_diff  # venta - compra
+
+
+class TestFetchExchangeAsync:
+    """Test suite for the async fetch path."""
+
+    @pytest.mark.asyncio
+    @patch('app.fetch_exchange._ASYNC_CLIENT.get')
+    @patch('app.fetch_exchange.db.insert_exchanges_bulk_async')
+    async def test_fetch_and_store_async_success(self, mock_insert, mock_get):
+        """Test successful async fetch and store of exchange rates."""
         mock_response = MagicMock()
-        mock_response.json.return_value = [
+        mock_response.content = orjson.dumps([
             {
                 "moneda": "USD",
                 "casa": "blue",
                 "nombre": "Blue",
-                "compra": 1400,
-                "venta": 1600,
+                "compra": 1415,
+                "venta": 1435,
                 "fechaActualizacion": "2025-11-06T19:58:00.000Z"
             }
-        ]
+        ])
+        mock_response.status_code = 200
+        mock_response.headers = {}
         mock_get.return_value = mock_response
         mock_insert.return_value = 1
 
-        result = fetch_and_store_exchange_rates()
+        result = await fetch_and_store_exchange_rates_async()
+
+        assert result["status"] == "ok"
+        assert result["inserted"] == 1
+        assert result["total"] == 1
+        assert result["errors"] is None
+        mock_get.assert_awaited_once_with("https://dolarapi.com/v1/dolares")
+        mock_insert.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch('app.fetch_exchange._ASYNC_CLIENT.get')
+    async def test_fetch_async_http_error(self, mock_get):
+        """Test async handling of HTTP errors."""
+        import httpx
+        mock_get.side_effect = httpx.HTTPError("Connection failed")
+
+        result = await fetch_and_store_exchange_rates_async()
+
+        assert result["status"] == "error"
+        assert "Connection failed" in result["message"]
+
+
+class TestParseIsoZ:
+    """Test suite for the fixed-layout timestamp parser."""
+
+    def test_parse_iso_z(self):
+        """Test parsing of DolarAPI fechaActualizacion timestamps."""
+        from datetime import datetime, timezone
+
+        dt = parse_iso_z("2025-11-06T19:58:00.000Z")
+        assert dt == datetime(2025, 11, 6, 19, 58, 0, tzinfo=timezone.utc)
 
-        # Verify insert was called with correct calculated values
-        call_args = mock_insert.call_args[0]
-        buy = call_args[1]
-        sell = call_args[2]
-        rate = call_args[3]
-        diff = call_args[4]
-        
-        assert buy == Decimal("1400")
-        assert sell == Decimal("1600")
-        assert rate == Decimal("1500")  # (1400 + 1600) / 2
-        assert diff == Decimal("200")   # 1600 - 1400
+        dt = parse_iso_z("2024-01-02T03:04:05.678Z")
+        assert dt.microsecond == 678000
+        assert dt.tzinfo is timezone.utc
 
 
 class TestExchangeModel: